@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import skia
+
+MAX_POOL_SIZE = 4
+MAX_POOLED_PIXELS = 512 * 512
+
+_local = threading.local()
+
+
+def _get_pool() -> "OrderedDict[tuple[int, int], skia.Surface]":
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = OrderedDict()
+    return pool
+
+
+def make_surface(width: int, height: int) -> skia.Surface:
+    """
+    创建指定大小的 surface，不经过缓存池
+
+    直接使用 PIL 所需的非预乘 RGBA 格式，导出像素时无需再转换格式
+    """
+    info = skia.ImageInfo.Make(
+        width, height, skia.kRGBA_8888_ColorType, skia.kUnpremul_AlphaType
+    )
+    return skia.Surface.MakeRaster(info)
+
+
+@contextmanager
+def pooled_surface(width: int, height: int) -> Iterator[skia.Surface]:
+    """
+    从当前线程的缓存池中取出指定大小的 surface，用完后放回
+
+    取出的 surface 画布已清空为透明，画布上的裁剪、变换等状态在放回时会被还原；
+    缓存池最多保留 `MAX_POOL_SIZE` 个 surface，超出时淘汰最久未使用的；
+    像素数超过 `MAX_POOLED_PIXELS` 的 surface 用完即弃，不放入缓存池；
+    缓存池每个线程最多占用约 `MAX_POOL_SIZE * MAX_POOLED_PIXELS * 4` 字节
+    """
+    if width * height > MAX_POOLED_PIXELS:
+        yield make_surface(width, height)
+        return
+
+    pool = _get_pool()
+    key = (width, height)
+    surface = pool.pop(key, None)
+    if surface is None:
+        surface = make_surface(width, height)
+    canvas = surface.getCanvas()
+    canvas.save()
+    canvas.clear(skia.Color4f.kTransparent)
+    try:
+        yield surface
+    finally:
+        canvas.restoreToCount(1)
+        pool[key] = surface
+        while len(pool) > MAX_POOL_SIZE:
+            pool.popitem(last=False)
@@ -1,7 +1,8 @@
 import math
+from functools import lru_cache, partial
 from io import BytesIO
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, Optional, Union
 
 import cv2
 import numpy as np
@@ -14,6 +15,7 @@ from PIL.ImageFilter import Filter
 
 import skia
 
+from ._skia_pool import pooled_surface
 from .gradient import Gradient
 from .text2image import DEFAULT_FALLBACK_FONTS, Text2Image
 from .typing import (
@@ -35,10 +37,126 @@ from .typing import (
     XYType,
 )
 
+try:
+    from pic_scale import Plan as PicScalePlan
+    from pic_scale import Resampling as PicScaleResampling
+
+    PIC_SCALE_RESAMPLINGS = {
+        Resampling.LANCZOS: PicScaleResampling.LANCZOS,
+        Resampling.BILINEAR: PicScaleResampling.BILINEAR,
+        Resampling.BICUBIC: PicScaleResampling.BICUBIC,
+    }
+except ImportError:
+    PicScalePlan = None
+    PIC_SCALE_RESAMPLINGS = {}
+
+PIC_SCALE_MODES = ("L", "LA", "RGB", "RGBA", "I;16", "F")
+
+
+@lru_cache(maxsize=32)
+def _get_resize_plan(
+    src_size: SizeType, dst_size: SizeType, resample: Resampling, mode: str
+):
+    """获取 pic-scale 的缩放计划，同尺寸的缩放可复用滤波器权重"""
+    assert PicScalePlan is not None
+    return PicScalePlan(src_size, dst_size, PIC_SCALE_RESAMPLINGS[resample], mode)
+
+
+def _apply_color_mask(
+    gray: np.ndarray, r: int, g: int, b: int, rgb_sum: int, out: np.ndarray
+):
+    """将灰度图按目标颜色的各通道比例着色，结果写入 `out`"""
+    if not rgb_sum:
+        out.fill(0)
+        return
+    scale = np.array((r, g, b), dtype=np.float64)
+    out[...] = gray[..., None] * scale / rgb_sum
+
+
+@lru_cache(maxsize=4)
+def _get_undistort_maps(
+    width: int, height: int, coefficients: DistortType
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    获取畸变映射表，相同尺寸和畸变参数的图片可复用
+
+    映射表每个像素占 6 字节，只缓存最近的少量映射表以免占用过多内存
+    """
+    camera_matrix = np.array([[100, 0, width / 2], [0, 100, height / 2], [0, 0, 1]])
+    return cv2.initUndistortRectifyMap(
+        camera_matrix,
+        np.asarray(coefficients),
+        None,
+        camera_matrix,
+        (width, height),
+        cv2.CV_16SC2,
+    )  # type: ignore
+
+
+def _fit_font_size(
+    build_t2i: Callable[[int], Text2Image],
+    min_fontsize: int,
+    max_fontsize: int,
+    width: float,
+    height: float,
+    allow_wrap: bool,
+) -> tuple[Text2Image, float, float]:
+    """
+    二分查找能在指定区域内画下文字的最大字体大小
+
+    :返回: 排版好的 `Text2Image` 对象及其宽、高
+    """
+
+    def measure(font_size: int) -> tuple[Text2Image, float, float]:
+        text2img = build_t2i(font_size)
+        text_w = text2img.longest_line
+        text2img.wrap(math.ceil(text_w))
+        text_h = text2img.height
+        if text_w > width and allow_wrap:
+            text2img.wrap(width)
+            text_w = text2img.longest_line
+            text_h = text2img.height
+        return text2img, text_w, text_h
+
+    best: Optional[tuple[Text2Image, float, float]] = None
+    lo = min_fontsize
+    hi = max_fontsize
+    mid = max_fontsize
+    while True:
+        result = measure(mid)
+        _, text_w, text_h = result
+        if text_w <= width and text_h <= height:
+            best = result
+            if mid == max_fontsize:
+                break
+            lo = mid + 1
+        else:
+            hi = mid - 1
+        if lo > hi:
+            break
+        mid = (lo + hi) // 2
+    if best is None:
+        raise ValueError("在指定的区域内画不下这段文字")
+    return best
+
 
 class BuildImage:
+    # 是否在 `resize` 中使用 pic-scale 缩放图片（需安装 pic-scale），
+    # pic-scale 的缩放结果与 Pillow 不完全一致，因此默认不启用
+    use_pic_scale: bool = False
+
     def __init__(self, image: IMG):
         self.image = image
+        self._draw: Optional[Draw] = None
+
+    def __getstate__(self) -> dict:
+        # 缓存的 `ImageDraw` 持有无法序列化的图片内核，不参与 pickle / deepcopy
+        state = self.__dict__.copy()
+        state["_draw"] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
 
     @property
     def width(self) -> int:
@@ -58,7 +176,10 @@ class BuildImage:
 
     @property
     def draw(self) -> Draw:
-        return ImageDraw.Draw(self.image)
+        # `self.image` 可能被替换，`draw_on_image` 也会替换图片的底层数据
+        if self._draw is None or self._draw.im is not self.image.im:
+            self._draw = ImageDraw.Draw(self.image)
+        return self._draw
 
     @classmethod
     def new(
@@ -106,9 +227,22 @@ class BuildImage:
             width = int(self.width * ratio)
             height = int(self.height * ratio)
 
-        image = BuildImage(
-            self.image.resize((width, height), resample=resample, **kwargs)
-        )
+        if (
+            self.use_pic_scale
+            and PicScalePlan is not None
+            and not kwargs
+            and resample in PIC_SCALE_RESAMPLINGS
+            and self.mode in PIC_SCALE_MODES
+        ):
+            try:
+                plan = _get_resize_plan(self.size, (width, height), resample, self.mode)
+                image = BuildImage(plan.resize(self.image))
+            except RuntimeError as e:
+                raise ValueError(str(e)) from e
+        else:
+            image = BuildImage(
+                self.image.resize((width, height), resample=resample, **kwargs)
+            )
 
         if keep_ratio:
             image = image.resize_canvas(size, direction, bg_color)
@@ -171,51 +305,55 @@ class BuildImage:
 
     def circle(self) -> "BuildImage":
         """将图片裁剪为圆形"""
-        image = self.square().image.convert("RGBA")
+        image = self.square().image
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        # copy=False 时 skia 不持有数据的引用，需保证其在绘制完成前存活
+        data = image.tobytes()
         skia_image = skia.Image.frombytes(
-            image.convert("RGBA").tobytes(),
-            image.size,  # type: ignore
-            skia.kRGBA_8888_ColorType,
+            data, image.size, skia.kRGBA_8888_ColorType, copy=False
         )
-        surface = skia.Surfaces.MakeRasterN32Premul(image.width, image.height)
-        canvas = surface.getCanvas()
-        canvas.clear(skia.Color4f.kTransparent)
         path = skia.Path()
         radius = image.width / 2
         path.addCircle(radius, radius, radius)
-        canvas.clipPath(path, doAntiAlias=True)
-        canvas.drawImage(skia_image, 0, 0)
-        surface.flushAndSubmit()
-        skia_image = surface.makeImageSnapshot()
-        pil_image = Image.fromarray(
-            skia_image.convert(
-                colorType=skia.kRGBA_8888_ColorType, alphaType=skia.kUnpremul_AlphaType
+        with pooled_surface(image.width, image.height) as surface:
+            canvas = surface.getCanvas()
+            canvas.clipPath(path, doAntiAlias=True)
+            canvas.drawImage(skia_image, 0, 0)
+            surface.flushAndSubmit()
+            pil_image = Image.fromarray(
+                surface.toarray(
+                    colorType=skia.kRGBA_8888_ColorType,
+                    alphaType=skia.kUnpremul_AlphaType,
+                ),
+                "RGBA",
             )
-        ).convert("RGBA")
         return BuildImage(pil_image)
 
     def circle_corner(self, r: float) -> "BuildImage":
         """将图片裁剪为圆角矩形"""
-        image = self.image.convert("RGBA")
+        image = self.image
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        # copy=False 时 skia 不持有数据的引用，需保证其在绘制完成前存活
+        data = image.tobytes()
         skia_image = skia.Image.frombytes(
-            image.convert("RGBA").tobytes(),
-            image.size,  # type: ignore
-            skia.kRGBA_8888_ColorType,
+            data, image.size, skia.kRGBA_8888_ColorType, copy=False
         )
-        surface = skia.Surfaces.MakeRasterN32Premul(image.width, image.height)
-        canvas = surface.getCanvas()
-        canvas.clear(skia.Color4f.kTransparent)
         path = skia.Path()
         path.addRoundRect(skia.Rect.MakeWH(image.width, image.height), r, r)
-        canvas.clipPath(path, doAntiAlias=True)
-        canvas.drawImage(skia_image, 0, 0)
-        surface.flushAndSubmit()
-        skia_image = surface.makeImageSnapshot()
-        pil_image = Image.fromarray(
-            skia_image.convert(
-                colorType=skia.kRGBA_8888_ColorType, alphaType=skia.kUnpremul_AlphaType
+        with pooled_surface(image.width, image.height) as surface:
+            canvas = surface.getCanvas()
+            canvas.clipPath(path, doAntiAlias=True)
+            canvas.drawImage(skia_image, 0, 0)
+            surface.flushAndSubmit()
+            pil_image = Image.fromarray(
+                surface.toarray(
+                    colorType=skia.kRGBA_8888_ColorType,
+                    alphaType=skia.kUnpremul_AlphaType,
+                ),
+                "RGBA",
             )
-        ).convert("RGBA")
         return BuildImage(pil_image)
 
     def crop(self, box: BoxType) -> "BuildImage":
@@ -245,13 +383,15 @@ class BuildImage:
             img = img.image
         new_img = Image.new(self.mode, self.size) if below else self.image.copy()
         if alpha:
-            img = img.convert("RGBA")
+            if img.mode != "RGBA":
+                img = img.convert("RGBA")
             new_img.paste(img, pos, mask=img)
         else:
             new_img.paste(img, pos)
         if below:
             new_img.paste(self.image, mask=self.image if self.mode == "RGBA" else None)
         self.image = new_img
+        self._draw = None
         return self
 
     def alpha_composite(
@@ -281,18 +421,17 @@ class BuildImage:
         """
 
         def find_coeffs(pa: PointsType, pb: PointsType):
-            matrix = []
-            for p1, p2 in zip(pa, pb):
-                matrix.append(
-                    [p1[0], p1[1], 1, 0, 0, 0, -p2[0] * p1[0], -p2[0] * p1[1]]
-                )
-                matrix.append(
-                    [0, 0, 0, p1[0], p1[1], 1, -p2[1] * p1[0], -p2[1] * p1[1]]
-                )
-            A = np.matrix(matrix, dtype=np.float32)
-            B = np.array(pb).reshape(8)
-            res = np.dot(np.linalg.inv(A.T * A) * A.T, B)
-            return np.array(res).reshape(8)
+            src = np.asarray(pa, dtype=np.float64)
+            dst = np.asarray(pb, dtype=np.float64)
+            A = np.zeros((8, 8), dtype=np.float64)
+            A[0::2, 0:2] = src
+            A[0::2, 2] = 1
+            A[1::2, 3:5] = src
+            A[1::2, 5] = 1
+            A[0::2, 6:8] = -dst[:, 0:1] * src
+            A[1::2, 6:8] = -dst[:, 1:2] * src
+            B = dst.reshape(8)
+            return np.linalg.solve(A, B)
 
         img_w, img_h = self.size
         points_w = [p[0] for p in points]
@@ -327,11 +466,11 @@ class BuildImage:
         if degree == 0:
             return self.copy()
         matrix = cv2.getRotationMatrix2D((degree / 2, degree / 2), angle + 45, 1)
-        kernel = np.diag(np.ones(degree))
-        kernel = cv2.warpAffine(kernel, matrix, (degree, degree)) / degree  # type: ignore
+        kernel = cv2.warpAffine(np.eye(degree), matrix, (degree, degree))
+        kernel /= degree
         blurred = cv2.filter2D(np.asarray(self.image), -1, kernel)
         cv2.normalize(blurred, blurred, 0, 255, cv2.NORM_MINMAX)
-        return BuildImage(Image.fromarray(np.array(blurred, dtype=np.uint8)))
+        return BuildImage(Image.fromarray(blurred.astype(np.uint8, copy=False)))
 
     def distort(self, coefficients: DistortType) -> "BuildImage":
         """
@@ -340,11 +479,8 @@ class BuildImage:
         :参数:
           * ``coefficients``: 畸变参数
         """
-        res = cv2.undistort(
-            np.asarray(self.image),
-            np.array([[100, 0, self.width / 2], [0, 100, self.height / 2], [0, 0, 1]]),
-            np.asarray(coefficients),
-        )
+        map1, map2 = _get_undistort_maps(self.width, self.height, tuple(coefficients))
+        res = cv2.remap(np.asarray(self.image), map1, map2, cv2.INTER_LINEAR)
         return BuildImage(Image.fromarray(np.array(res, dtype=np.uint8)))
 
     def color_mask(self, color: ColorType) -> "BuildImage":
@@ -359,7 +495,6 @@ class BuildImage:
         img_array = np.asarray(img)
         img_gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
         img_hsl = cv2.cvtColor(img_array, cv2.COLOR_RGB2HLS)
-        img_new = np.zeros((h, w, 3), np.uint8)
 
         if isinstance(color, str):
             color = getrgb(color)
@@ -367,19 +502,8 @@ class BuildImage:
         g = color[1]
         b = color[2]
         rgb_sum = sum(color)
-        for i in range(h):
-            for j in range(w):
-                value = int(img_gray[i, j])
-                new_color = (
-                    [
-                        int(value * r / rgb_sum),
-                        int(value * g / rgb_sum),
-                        int(value * b / rgb_sum),
-                    ]
-                    if rgb_sum
-                    else [0, 0, 0]
-                )
-                img_new[i, j] = new_color
+        img_new = np.empty((h, w, 3), np.uint8)
+        _apply_color_mask(img_gray, r, g, b, rgb_sum, img_new)
         img_new_hsl = cv2.cvtColor(img_new, cv2.COLOR_RGB2HLS)
         result = np.dstack(
             (img_new_hsl[:, :, 0], img_hsl[:, :, 1], img_new_hsl[:, :, 2])
@@ -502,18 +626,22 @@ class BuildImage:
           * ``fallback_fonts_families``: 指定备选字体
         """
 
+        make_t2i = partial(
+            Text2Image.from_text,
+            text,
+            font_style=font_style,
+            fill=fill,
+            align=lines_align,
+            stroke_fill=stroke_fill,
+            font_families=font_families,
+            fallback_fonts_families=fallback_fonts_families,
+        )
+
+        def build_t2i(font_size: int) -> Text2Image:
+            return make_t2i(font_size, stroke_width=round(font_size * stroke_ratio))
+
         if len(xy) == 2:
-            text2img = Text2Image.from_text(
-                text,
-                font_size,
-                font_style=font_style,
-                fill=fill,
-                align=lines_align,
-                stroke_width=round(font_size * stroke_ratio),
-                stroke_fill=stroke_fill,
-                font_families=font_families,
-                fallback_fonts_families=fallback_fonts_families,
-            )
+            text2img = build_t2i(font_size)
             text2img.draw_on_image(self.image, xy)
             return self
 
@@ -521,45 +649,24 @@ class BuildImage:
         top = xy[1]
         width = xy[2] - xy[0]
         height = xy[3] - xy[1]
-        font_size = max_fontsize
-        while True:
-            text2img = Text2Image.from_text(
-                text,
-                font_size,
-                font_style=font_style,
-                fill=fill,
-                align=lines_align,
-                stroke_width=round(font_size * stroke_ratio),
-                stroke_fill=stroke_fill,
-                font_families=font_families,
-                fallback_fonts_families=fallback_fonts_families,
-            )
-            text_w = text2img.longest_line
-            text2img.wrap(math.ceil(text_w))
-            text_h = text2img.height
-            if text_w > width and allow_wrap:
-                text2img.wrap(width)
-                text_w = text2img.longest_line
-                text_h = text2img.height
-            if text_w > width or text_h > height:
-                font_size -= 1
-                if font_size < min_fontsize:
-                    raise ValueError("在指定的区域内画不下这段文字")
-            else:
-                x = left  # "left"
-                if halign == "center":
-                    x += (width - text_w) / 2
-                elif halign == "right":
-                    x += width - text_w
+        text2img, text_w, text_h = _fit_font_size(
+            build_t2i, min_fontsize, max_fontsize, width, height, allow_wrap
+        )
 
-                y = top  # "top"
-                if valign == "center":
-                    y += (height - text_h) / 2
-                elif valign == "bottom":
-                    y += height - text_h
+        x = left  # "left"
+        if halign == "center":
+            x += (width - text_w) / 2
+        elif halign == "right":
+            x += width - text_w
 
-                text2img.draw_on_image(self.image, (x, y))
-                return self
+        y = top  # "top"
+        if valign == "center":
+            y += (height - text_h) / 2
+        elif valign == "bottom":
+            y += height - text_h
+
+        text2img.draw_on_image(self.image, (x, y))
+        return self
 
     def draw_bbcode_text(
         self,
@@ -600,17 +707,19 @@ class BuildImage:
           * ``fallback_fonts_families``: 指定备选字体
         """
 
+        build_t2i = partial(
+            Text2Image.from_bbcode_text,
+            text,
+            fill=fill,
+            align=lines_align,
+            stroke_ratio=stroke_ratio,
+            stroke_fill=stroke_fill,
+            font_families=font_families,
+            fallback_fonts_families=fallback_fonts_families,
+        )
+
         if len(xy) == 2:
-            text2img = Text2Image.from_bbcode_text(
-                text,
-                font_size,
-                fill=fill,
-                align=lines_align,
-                stroke_ratio=stroke_ratio,
-                stroke_fill=stroke_fill,
-                font_families=font_families,
-                fallback_fonts_families=fallback_fonts_families,
-            )
+            text2img = build_t2i(font_size)
             text2img.draw_on_image(self.image, xy)
             return self
 
@@ -618,44 +727,24 @@ class BuildImage:
         top = xy[1]
         width = xy[2] - xy[0]
         height = xy[3] - xy[1]
-        font_size = max_fontsize
-        while True:
-            text2img = Text2Image.from_bbcode_text(
-                text,
-                font_size,
-                fill=fill,
-                align=lines_align,
-                stroke_ratio=stroke_ratio,
-                stroke_fill=stroke_fill,
-                font_families=font_families,
-                fallback_fonts_families=fallback_fonts_families,
-            )
-            text_w = text2img.longest_line
-            text2img.wrap(math.ceil(text_w))
-            text_h = text2img.height
-            if text_w > width and allow_wrap:
-                text2img.wrap(width)
-                text_w = text2img.longest_line
-                text_h = text2img.height
-            if text_w > width or text_h > height:
-                font_size -= 1
-                if font_size < min_fontsize:
-                    raise ValueError("在指定的区域内画不下这段文字")
-            else:
-                x = left  # "left"
-                if halign == "center":
-                    x += (width - text_w) / 2
-                elif halign == "right":
-                    x += width - text_w
+        text2img, text_w, text_h = _fit_font_size(
+            build_t2i, min_fontsize, max_fontsize, width, height, allow_wrap
+        )
+
+        x = left  # "left"
+        if halign == "center":
+            x += (width - text_w) / 2
+        elif halign == "right":
+            x += width - text_w
 
-                y = top  # "top"
-                if valign == "center":
-                    y += (height - text_h) / 2
-                elif valign == "bottom":
-                    y += height - text_h
+        y = top  # "top"
+        if valign == "center":
+            y += (height - text_h) / 2
+        elif valign == "bottom":
+            y += height - text_h
 
-                text2img.draw_on_image(self.image, (x, y))
-                return self
+        text2img.draw_on_image(self.image, (x, y))
+        return self
 
     def save(self, format: str, **params) -> BytesIO:
         output = BytesIO()
@@ -670,11 +759,12 @@ class BuildImage:
           * ``bg_color``: 由 png 转为 jpg 时的背景颜色，默认为白色
         """
         if self.mode == "RGBA":
-            img = self.new("RGBA", self.size, bg_color)
-            img.paste(self.image, alpha=True)
-        else:
-            img = self
-        return img.convert("RGB").save("jpeg")
+            alpha = self.image.getchannel("A")
+            if alpha.getextrema() != (255, 255):
+                img = self.new("RGB", self.size, bg_color)
+                img.image.paste(self.image, mask=alpha)
+                return img.save("jpeg")
+        return self.convert("RGB").save("jpeg")
 
     def save_png(self) -> BytesIO:
         """保存图片为 png 格式"""
@@ -1,8 +1,11 @@
+from typing import Optional
+
 from PIL import Image
 from PIL.Image import Image as IMG
 
 import skia
 
+from ._skia_pool import pooled_surface
 from .typing import ColorType, SizeType, SkiaPaint, XYType
 from .utils import to_skia_color
 
@@ -20,13 +23,30 @@ class ColorStop:
 
 class Gradient:
     def __init__(self, color_stops: list[ColorStop] = []):
-        self.color_stops = color_stops
-        self.color_stops.sort()
+        self.color_stops = sorted(color_stops)
+        self._stops_key: Optional[list[tuple]] = None
+        self._colors: list[int] = []
+        self._positions: list[float] = []
 
     def add_color_stop(self, stop: float, color: "ColorType"):
         self.color_stops.append(ColorStop(stop, color))
         self.color_stops.sort()
 
+    def _get_stops(self) -> tuple[list[int], list[float]]:
+        """获取各停止点的颜色与位置，`color_stops` 未改变时复用上次的结果"""
+        key = [
+            (
+                stop.stop,
+                stop.color if isinstance(stop.color, str) else tuple(stop.color),
+            )
+            for stop in self.color_stops
+        ]
+        if key != self._stops_key:
+            self._colors = [int(to_skia_color(stop.color)) for stop in self.color_stops]
+            self._positions = [stop.stop for stop in self.color_stops]
+            self._stops_key = key
+        return self._colors, self._positions
+
     def create_image(self, size: "SizeType") -> IMG:
         raise NotImplementedError
 
@@ -48,27 +68,28 @@ class LinearGradient(Gradient):
         super().__init__(color_stops)
 
     def create_image(self, size: "SizeType") -> IMG:
-        surface = skia.Surfaces.MakeRasterN32Premul(size[0], size[1])
-        canvas = surface.getCanvas()
-        canvas.clear(skia.Color4f.kTransparent)
         paint = self.create_paint()
-        canvas.drawPaint(paint)
-        surface.flushAndSubmit()
-        skia_image = surface.makeImageSnapshot()
-        pil_image = Image.fromarray(
-            skia_image.convert(
-                colorType=skia.kRGBA_8888_ColorType, alphaType=skia.kUnpremul_AlphaType
+        with pooled_surface(size[0], size[1]) as surface:
+            canvas = surface.getCanvas()
+            canvas.drawPaint(paint)
+            surface.flushAndSubmit()
+            pil_image = Image.fromarray(
+                surface.toarray(
+                    colorType=skia.kRGBA_8888_ColorType,
+                    alphaType=skia.kUnpremul_AlphaType,
+                ),
+                "RGBA",
             )
-        ).convert("RGBA")
         return pil_image
 
     def create_paint(self) -> SkiaPaint:
+        colors, positions = self._get_stops()
         paint = skia.Paint()
         paint.setShader(
             skia.GradientShader.MakeLinear(
                 points=[skia.Point(self.x0, self.y0), skia.Point(self.x1, self.y1)],
-                colors=[int(to_skia_color(stop.color)) for stop in self.color_stops],
-                positions=[stop.stop for stop in self.color_stops],
+                colors=colors,
+                positions=positions,
             )
         )
         return paint
@@ -1,7 +1,9 @@
 import math
 import re
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Optional, Union
+from functools import lru_cache
+from typing import Any, Callable, Optional, Union
 
 from bbcode import Parser
 from PIL import Image
@@ -11,6 +13,7 @@ from PIL.ImageColor import colormap
 import skia
 from skia import textlayout
 
+from ._skia_pool import make_surface, pooled_surface
 from .typing import (
     BoxType,
     ColorType,
@@ -23,7 +26,12 @@ from .typing import (
     SkiaParagraph,
     SkiaTextAlign,
 )
-from .utils import to_skia_color, to_skia_font_style, to_skia_text_align
+from .utils import (
+    HEX_COLOR_PATTERN,
+    to_skia_color,
+    to_skia_font_style,
+    to_skia_text_align,
+)
 
 DEFAULT_FALLBACK_FONTS: list[str] = [
     "Arial",
@@ -45,14 +53,195 @@ DEFAULT_FALLBACK_FONTS: list[str] = [
 
 font_collection = textlayout.FontCollection()
 font_collection.setDefaultFontManager(skia.FontMgr())
+unicodes = skia.Unicodes.ICU.Make()
 
 ALIGN_PATTERN = re.compile(r"left|right|center")
-css_colors = "|".join(colormap.keys())
-COLOR_PATTERN = re.compile(rf"#[a-fA-F0-9]{{6}}|{css_colors}")
-STROKE_PATTERN = COLOR_PATTERN
+CSS_COLORS = frozenset(colormap.keys())
 FONT_PATTERN = re.compile(r".+")
 SIZE_PATTERN = re.compile(r"\d+")
 
+bbcode_parser = Parser()
+bbcode_parser.recognized_tags = {}
+bbcode_parser.add_formatter("align", None)
+bbcode_parser.add_formatter("color", None)
+bbcode_parser.add_formatter("stroke", None)
+bbcode_parser.add_formatter("font", None)
+bbcode_parser.add_formatter("size", None)
+bbcode_parser.add_formatter("b", None)
+bbcode_parser.add_formatter("i", None)
+bbcode_parser.add_formatter("u", None)
+bbcode_parser.add_formatter("del", None)
+
+BBCODE_TAG_PATTERN = re.compile(
+    r"\[(?:/(align|color|stroke|font|size|b|i|u|del)"
+    r"|(align|color|stroke|font|size|b|i|u|del)(?:=([^\[\]\"'=\n]*))?)\]",
+    re.IGNORECASE,
+)
+
+BBCodeToken = tuple[int, Optional[str], Optional[dict[str, str]], str]
+
+
+def _tokenize_bbcode(text: str) -> list[BBCodeToken]:
+    """
+    用正则一次扫描切分 `BBCode` 文本，结果与 `bbcode.Parser.tokenize` 一致；
+    文本中含有无法识别的 `[` 时交给 `bbcode.Parser` 处理
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    tokens: list[BBCodeToken] = []
+
+    def add_text(data: str):
+        parts = data.split("\n")
+        for num, part in enumerate(parts):
+            if part:
+                tokens.append((4, None, None, part))
+            if num < len(parts) - 1:
+                tokens.append((3, None, None, "\n"))
+
+    pos = 0
+    for match in BBCODE_TAG_PATTERN.finditer(text):
+        start = match.start()
+        if start > pos:
+            if "[" in text[pos:start]:
+                return bbcode_parser.tokenize(text)
+            add_text(text[pos:start])
+        close_name, open_name, value = match.groups()
+        if close_name:
+            tokens.append((2, close_name.lower(), None, match.group()))
+        else:
+            opts = {} if value is None else {open_name.lower(): value.strip()}
+            tokens.append((1, open_name.lower(), opts, match.group()))
+        pos = match.end()
+    if pos < len(text):
+        if "[" in text[pos:]:
+            return bbcode_parser.tokenize(text)
+        add_text(text[pos:])
+    return tokens
+
+
+def _is_color(value: str) -> bool:
+    return value in CSS_COLORS or HEX_COLOR_PATTERN.fullmatch(value) is not None
+
+
+@lru_cache(maxsize=8)
+def _get_paragraph_style(align: SkiaTextAlign) -> textlayout.ParagraphStyle:  # type: ignore
+    para_style = textlayout.ParagraphStyle()
+    para_style.setTextAlign(align)
+    return para_style
+
+
+def _make_text_styles(
+    font_size: float,
+    font_style: Union[FontStyle, SkiaFontStyle],
+    fill: Union[ColorType, SkiaPaint],
+    stroke_width: float,
+    stroke_fill: Optional[Union[ColorType, SkiaPaint]],
+    font_families: Sequence[str],
+    fallback_fonts_families: Sequence[str],
+) -> tuple[textlayout.TextStyle, Optional[textlayout.TextStyle]]:  # type: ignore
+    if isinstance(fill, skia.Paint):
+        paint = fill
+    else:
+        paint = skia.Paint()
+        paint.setColor4f(to_skia_color(fill))
+    paint.setAntiAlias(True)
+
+    style = textlayout.TextStyle()
+    style.setFontSize(font_size)
+    style.setForegroundPaint(paint)
+    style.setFontFamilies([*font_families, *fallback_fonts_families])
+    if not isinstance(font_style, skia.FontStyle):
+        font_style = to_skia_font_style(font_style)
+    style.setFontStyle(font_style)
+    style.setLocale("en")
+
+    stroke_style = None
+    if stroke_width and stroke_fill:
+        if isinstance(stroke_fill, skia.Paint):
+            stroke_paint = stroke_fill
+        else:
+            stroke_paint = skia.Paint()
+            stroke_paint.setColor4f(to_skia_color(stroke_fill))
+        stroke_paint.setAntiAlias(True)
+        stroke_paint.setStyle(skia.Paint.kStroke_Style)
+        stroke_paint.setStrokeJoin(skia.Paint.kRound_Join)
+        stroke_paint.setStrokeWidth(stroke_width * 2)
+
+        stroke_style = textlayout.TextStyle()
+        stroke_style.setFontSize(font_size)
+        stroke_style.setForegroundPaint(stroke_paint)
+        stroke_style.setFontFamilies([*font_families, *fallback_fonts_families])
+        stroke_style.setFontStyle(font_style)
+        stroke_style.setLocale("en")
+
+    return style, stroke_style
+
+
+@lru_cache(maxsize=128)
+def _cached_text_styles(
+    font_size: float,
+    font_style: FontStyle,
+    fill: ColorType,
+    stroke_width: float,
+    stroke_fill: Optional[ColorType],
+    font_families: tuple[str, ...],
+    fallback_fonts_families: tuple[str, ...],
+) -> tuple[textlayout.TextStyle, Optional[textlayout.TextStyle]]:  # type: ignore
+    """
+    缓存 `Text2Image.from_text` 使用的文字样式
+
+    样式在构建段落时会被复制，缓存的样式本身不会被修改；
+    段落排版时会修改自身状态，因此每次仍需构建新的段落
+    """
+    return _make_text_styles(
+        font_size,
+        font_style,
+        fill,
+        stroke_width,
+        stroke_fill,
+        font_families,
+        fallback_fonts_families,
+    )
+
+
+def _build_paragraph(
+    text: str,
+    para_style: textlayout.ParagraphStyle,  # type: ignore
+    style: textlayout.TextStyle,  # type: ignore
+) -> SkiaParagraph:
+    builder = textlayout.ParagraphBuilder.make(para_style, font_collection, unicodes)
+    builder.pushStyle(style)
+    builder.addText(text)
+    paragraph = builder.Build()
+    paragraph.layout(math.inf)
+    return paragraph
+
+
+@dataclass
+class _BBCodeState:
+    """解析 `BBCode` 时当前生效的文字样式"""
+
+    color: ColorType
+    font: Optional[str]
+    size: float
+    bold: bool
+    italic: bool
+    underline: bool
+    linethrough: bool
+    stroke: Optional[ColorType]
+    align: HAlignType
+
+    @property
+    def style_args(self) -> tuple:
+        return (
+            self.color,
+            self.font,
+            self.size,
+            self.bold,
+            self.italic,
+            self.underline,
+            self.linethrough,
+        )
+
 
 @dataclass
 class Paragraph:
@@ -69,8 +258,11 @@ class Paragraph:
         return self.paragraph.Height
 
     def wrap(self, width: float):
-        self.paragraph.layout(width)
-        if self.stroke_paragraph:
+        # skia 排版时会将宽度向下取整，段落已按该宽度排版时无需重新排版
+        layout_width = math.floor(width) if math.isfinite(width) else width
+        if self.paragraph.Width != layout_width:
+            self.paragraph.layout(width)
+        if self.stroke_paragraph and self.stroke_paragraph.Width != layout_width:
             self.stroke_paragraph.layout(width)
         return self
 
@@ -108,61 +300,43 @@ class Text2Image:
           * ``fallback_fonts_families``: 指定备选字体
         """
 
-        para_style = textlayout.ParagraphStyle()
         if not isinstance(align, textlayout.TextAlign):
             align = to_skia_text_align(align)
-        para_style.setTextAlign(align)
 
-        if isinstance(fill, skia.Paint):
-            paint = fill
+        if (
+            isinstance(fill, skia.Paint)
+            or isinstance(stroke_fill, skia.Paint)
+            or isinstance(font_style, skia.FontStyle)
+        ):
+            style, stroke_style = _make_text_styles(
+                font_size,
+                font_style,
+                fill,
+                stroke_width,
+                stroke_fill,
+                font_families,
+                fallback_fonts_families,
+            )
         else:
-            paint = skia.Paint()
-            paint.setColor4f(to_skia_color(fill))
-        paint.setAntiAlias(True)
-
-        style = textlayout.TextStyle()
-        style.setFontSize(font_size)
-        style.setForegroundPaint(paint)
-        style.setFontFamilies(font_families + fallback_fonts_families)
-        if not isinstance(font_style, skia.FontStyle):
-            font_style = to_skia_font_style(font_style)
-        style.setFontStyle(font_style)
-        style.setLocale("en")
-
-        builder = textlayout.ParagraphBuilder.make(
-            para_style, font_collection, skia.Unicodes.ICU.Make()
-        )
-        builder.pushStyle(style)
-        builder.addText(text)
-        paragraph = builder.Build()
-        paragraph.layout(math.inf)
+            if not isinstance(fill, str):
+                fill = tuple(fill)  # type: ignore
+            if stroke_fill is not None and not isinstance(stroke_fill, str):
+                stroke_fill = tuple(stroke_fill)  # type: ignore
+            style, stroke_style = _cached_text_styles(
+                font_size,
+                font_style,
+                fill,
+                stroke_width,
+                stroke_fill,
+                tuple(font_families),
+                tuple(fallback_fonts_families),
+            )
 
+        para_style = _get_paragraph_style(align)
+        paragraph = _build_paragraph(text, para_style, style)
         stroke_paragraph = None
-        if stroke_width and stroke_fill:
-            if isinstance(stroke_fill, skia.Paint):
-                stroke_paint = stroke_fill
-            else:
-                stroke_paint = skia.Paint()
-                stroke_paint.setColor4f(to_skia_color(stroke_fill))
-            stroke_paint.setAntiAlias(True)
-            stroke_paint.setStyle(skia.Paint.kStroke_Style)
-            stroke_paint.setStrokeJoin(skia.Paint.kRound_Join)
-            stroke_paint.setStrokeWidth(stroke_width * 2)
-
-            stroke_style = textlayout.TextStyle()
-            stroke_style.setFontSize(font_size)
-            stroke_style.setForegroundPaint(stroke_paint)
-            stroke_style.setFontFamilies(font_families + fallback_fonts_families)
-            stroke_style.setFontStyle(font_style)
-            stroke_style.setLocale("en")
-
-            stroke_builder = textlayout.ParagraphBuilder.make(
-                para_style, font_collection, skia.Unicodes.ICU.Make()
-            )
-            stroke_builder.pushStyle(stroke_style)
-            stroke_builder.addText(text)
-            stroke_paragraph = stroke_builder.Build()
-            stroke_paragraph.layout(math.inf)
+        if stroke_style is not None:
+            stroke_paragraph = _build_paragraph(text, para_style, stroke_style)
 
         return cls([Paragraph(paragraph, stroke_paragraph, align)])
 
@@ -205,11 +379,12 @@ class Text2Image:
           * ``fallback_fonts_families``: 指定备选字体
         """
 
+        base_fonts = [*font_families, *fallback_fonts_families]
+
         def new_builder(text_align: HAlignType) -> textlayout.ParagraphBuilder:  # type: ignore
-            para_style = textlayout.ParagraphStyle()
-            para_style.setTextAlign(to_skia_text_align(text_align))
+            para_style = _get_paragraph_style(to_skia_text_align(text_align))
             builder = textlayout.ParagraphBuilder.make(
-                para_style, font_collection, skia.Unicodes.ICU.Make()
+                para_style, font_collection, unicodes
             )
             return builder
 
@@ -230,10 +405,7 @@ class Text2Image:
             style.setFontSize(text_size)
             style.setForegroundPaint(paint)
 
-            fonts = font_families + fallback_fonts_families
-            if text_font:
-                fonts.insert(0, text_font)
-            style.setFontFamilies(fonts)
+            style.setFontFamilies([text_font, *base_fonts] if text_font else base_fonts)
             style.setLocale("en")
 
             if text_bold and text_italic:
@@ -272,122 +444,129 @@ class Text2Image:
             return paint
 
         paragraphs: list[Paragraph] = []
-        builder: Optional[
-            tuple[textlayout.ParagraphBuilder, textlayout.ParagraphBuilder]  # type: ignore
-        ] = None
-
-        default_style = new_style(fill, None, font_size, False, False, False, False)
-
-        align_stack: list[HAlignType] = []
-        color_stack: list[ColorType] = []
-        stroke_stack: list[ColorType] = []
-        font_stack: list[str] = []
-        size_stack: list[int] = []
-        bold_stack: list[bool] = []
-        italic_stack: list[bool] = []
-        underline_stack: list[bool] = []
-        linethrough_stack: list[bool] = []
+        builder: Optional[textlayout.ParagraphBuilder] = None  # type: ignore
+        builder_align: HAlignType = align
+        # 描边段落需与正文段落排版一致，因此记录每段文字及其样式，
+        # 仅在段落中出现描边时才构建描边段落
+        stroke_runs: list[tuple[tuple, Optional[ColorType], str]] = []
+
+        if not isinstance(fill, str):
+            fill = tuple(fill)  # type: ignore
+        default_style_args = (fill, None, font_size, False, False, False, False)
+        default_style = new_style(*default_style_args)
+        styles: dict[tuple, textlayout.TextStyle] = {}  # type: ignore
+        stroke_styles: dict[tuple, textlayout.TextStyle] = {}  # type: ignore
+        last_style_args: tuple = default_style_args
+
+        def get_style(style_args: tuple) -> textlayout.TextStyle:  # type: ignore
+            style = styles.get(style_args)
+            if style is None:
+                style = styles[style_args] = new_style(*style_args)
+            return style
+
+        # 标签开启时将对应样式的旧值压入栈中，关闭时出栈恢复
+        state = _BBCodeState(*default_style_args, stroke=stroke_fill, align=align)
         last_align: HAlignType = align
         has_stroke: bool = False
 
+        def start_builder(text_align: HAlignType) -> textlayout.ParagraphBuilder:  # type: ignore
+            nonlocal builder
+            nonlocal builder_align
+            nonlocal last_style_args
+            current_builder = new_builder(text_align)
+            current_builder.pushStyle(default_style)
+            builder = current_builder
+            builder_align = text_align
+            last_style_args = default_style_args
+            return current_builder
+
+        def build_stroke_paragraph() -> SkiaParagraph:
+            stroke_builder = new_builder(builder_align)
+            stroke_builder.pushStyle(default_style)
+            last_run = (default_style_args, None)
+            for style_args, text_stroke, run_text in stroke_runs:
+                run = (style_args, text_stroke)
+                if run != last_run:
+                    if text_stroke:
+                        stroke_style = stroke_styles.get(run)
+                        if stroke_style is None:
+                            stroke_style = new_style(*style_args)
+                            stroke_paint = new_stroke_paint(text_stroke, style_args[2])
+                            stroke_style.setForegroundPaint(stroke_paint)
+                            stroke_styles[run] = stroke_style
+                    else:
+                        stroke_style = get_style(style_args)
+                    stroke_builder.pop()
+                    stroke_builder.pushStyle(stroke_style)
+                    last_run = run
+                stroke_builder.addText(run_text)
+            return stroke_builder.Build()
+
         def build():
             nonlocal builder
             nonlocal has_stroke
-            if builder:
-                paragraph = builder[0].Build()
+            if builder is not None:
+                paragraph = builder.Build()
                 paragraph.layout(math.inf)
                 stroke_paragraph = None
                 if has_stroke:
-                    stroke_paragraph = builder[1].Build()
+                    stroke_paragraph = build_stroke_paragraph()
                     stroke_paragraph.layout(math.inf)
                 has_stroke = False
                 builder = None
+                stroke_runs.clear()
                 paragraphs.append(Paragraph(paragraph, stroke_paragraph, last_align))
 
-        parser = Parser()
-        parser.recognized_tags = {}
-        parser.add_formatter("align", None)
-        parser.add_formatter("color", None)
-        parser.add_formatter("stroke", None)
-        parser.add_formatter("font", None)
-        parser.add_formatter("size", None)
-        parser.add_formatter("b", None)
-        parser.add_formatter("i", None)
-        parser.add_formatter("u", None)
-        parser.add_formatter("del", None)
-
-        tokens = parser.tokenize(text)
+        tag_handlers: dict[
+            str, tuple[str, list, Optional[Callable[[str], Any]], Optional[Callable]]
+        ] = {
+            "color": ("color", [], _is_color, str),
+            "font": ("font", [], FONT_PATTERN.fullmatch, str),
+            "size": ("size", [], SIZE_PATTERN.fullmatch, int),
+            "b": ("bold", [], None, None),
+            "i": ("italic", [], None, None),
+            "u": ("underline", [], None, None),
+            "del": ("linethrough", [], None, None),
+            "stroke": ("stroke", [], _is_color, str),
+            "align": ("align", [], ALIGN_PATTERN.fullmatch, str),
+        }
+
+        tokens = _tokenize_bbcode(text)
         for token_type, tag_name, tag_opts, token_text in tokens:
             if token_type == 1:
-                if tag_name == "align":
-                    if re.fullmatch(ALIGN_PATTERN, tag_opts["align"]):
-                        align_stack.append(tag_opts["align"])
-                elif tag_name == "color":
-                    if re.fullmatch(COLOR_PATTERN, tag_opts["color"]):
-                        color_stack.append(tag_opts["color"])
-                elif tag_name == "stroke":
-                    if re.fullmatch(STROKE_PATTERN, tag_opts["stroke"]):
-                        stroke_stack.append(tag_opts["stroke"])
-                elif tag_name == "font":
-                    if re.fullmatch(FONT_PATTERN, tag_opts["font"]):
-                        font_stack.append(tag_opts["font"])
-                elif tag_name == "size":
-                    if re.fullmatch(SIZE_PATTERN, tag_opts["size"]):
-                        size_stack.append(int(tag_opts["size"]))
-                elif tag_name == "b":
-                    bold_stack.append(True)
-                elif tag_name == "i":
-                    italic_stack.append(True)
-                elif tag_name == "u":
-                    underline_stack.append(True)
-                elif tag_name == "del":
-                    linethrough_stack.append(True)
+                # 开始标签的标签名和参数总是存在
+                assert tag_name is not None
+                assert tag_opts is not None
+                handler = tag_handlers.get(tag_name)
+                if handler:
+                    field, stack, match, convert = handler
+                    if match is None:
+                        stack.append(getattr(state, field))
+                        setattr(state, field, True)
+                    else:
+                        value = tag_opts.get(tag_name)
+                        if value and match(value):
+                            stack.append(getattr(state, field))
+                            setattr(state, field, convert(value))  # type: ignore
             elif token_type == 2:
-                if tag_name == "align":
-                    if align_stack:
-                        align_stack.pop()
-                elif tag_name == "color":
-                    if color_stack:
-                        color_stack.pop()
-                elif tag_name == "stroke":
-                    if stroke_stack:
-                        stroke_stack.pop()
-                elif tag_name == "font":
-                    if font_stack:
-                        font_stack.pop()
-                elif tag_name == "size":
-                    if size_stack:
-                        size_stack.pop()
-                elif tag_name == "b":
-                    if bold_stack:
-                        bold_stack.pop()
-                elif tag_name == "i":
-                    if italic_stack:
-                        italic_stack.pop()
-                elif tag_name == "u":
-                    if underline_stack:
-                        underline_stack.pop()
-                elif tag_name == "del":
-                    if linethrough_stack:
-                        linethrough_stack.pop()
+                assert tag_name is not None
+                handler = tag_handlers.get(tag_name)
+                if handler:
+                    field, stack, _, _ = handler
+                    if stack:
+                        setattr(state, field, stack.pop())
             elif token_type == 3:
-                if not builder:
-                    builder = (new_builder(align), new_builder(align))
-                    builder[0].pushStyle(default_style)
-                    builder[1].pushStyle(default_style)
-                builder[0].addText("\n")
-                builder[1].addText("\n")
+                current_builder = (
+                    builder if builder is not None else start_builder(align)
+                )
+                current_builder.addText("\n")
+                if stroke_runs:
+                    style_args, text_stroke, _ = stroke_runs[-1]
+                else:
+                    style_args, text_stroke = default_style_args, None
+                stroke_runs.append((style_args, text_stroke, "\n"))
             elif token_type == 4:
-                text_align = align_stack[-1] if align_stack else align
-                text_color = color_stack[-1] if color_stack else fill
-                text_stroke = stroke_stack[-1] if stroke_stack else stroke_fill
-                text_font = font_stack[-1] if font_stack else None
-                text_size = size_stack[-1] if size_stack else font_size
-                text_bold = bold_stack[-1] if bold_stack else False
-                text_italic = italic_stack[-1] if italic_stack else False
-                text_underline = underline_stack[-1] if underline_stack else False
-                text_linethrough = linethrough_stack[-1] if linethrough_stack else False
-
+                text_align = state.align
                 if text_align != last_align:
                     build()
                     last_align = text_align
@@ -395,38 +574,21 @@ class Text2Image:
                 if not token_text:
                     continue
 
-                if not builder:
-                    builder = (new_builder(text_align), new_builder(text_align))
-                    builder[0].pushStyle(default_style)
-                    builder[1].pushStyle(default_style)
-                style = new_style(
-                    text_color,
-                    text_font,
-                    text_size,
-                    text_bold,
-                    text_italic,
-                    text_underline,
-                    text_linethrough,
-                )
-                stroke_style = new_style(
-                    text_color,
-                    text_font,
-                    text_size,
-                    text_bold,
-                    text_italic,
-                    text_underline,
-                    text_linethrough,
+                current_builder = (
+                    builder if builder is not None else start_builder(text_align)
                 )
+                style_args = state.style_args
+                text_stroke = state.stroke
                 if stroke_ratio and text_stroke:
                     has_stroke = True
-                    stroke_paint = new_stroke_paint(text_stroke, text_size)
-                    stroke_style.setForegroundPaint(stroke_paint)
-                builder[0].pop()
-                builder[0].pushStyle(style)
-                builder[0].addText(token_text)
-                builder[1].pop()
-                builder[1].pushStyle(stroke_style)
-                builder[1].addText(token_text)
+                else:
+                    text_stroke = None
+                stroke_runs.append((style_args, text_stroke, token_text))
+                if style_args != last_style_args:
+                    current_builder.pop()
+                    current_builder.pushStyle(get_style(style_args))
+                    last_style_args = style_args
+                current_builder.addText(token_text)
 
         build()
 
@@ -436,19 +598,27 @@ class Text2Image:
     def longest_line(self) -> float:
         if not self.paragraphs:
             return 0
-        return max([para.longest_line for para in self.paragraphs])
+        return max(para.longest_line for para in self.paragraphs)
 
     @property
     def height(self) -> float:
         if not self.paragraphs:
             return 0
-        return sum([para.height for para in self.paragraphs])
+        return sum(para.height for para in self.paragraphs)
 
     def wrap(self, width: float) -> "Text2Image":
         for para in self.paragraphs:
             para.wrap(width)
         return self
 
+    def _paint(self, canvas: skia.Canvas, x: float, y: float):
+        """在画布的 (`x`, `y`) 处依次绘制所有段落"""
+        for para in self.paragraphs:
+            if para.stroke_paragraph:
+                para.stroke_paragraph.paint(canvas, x, y)
+            para.paragraph.paint(canvas, x, y)
+            y += para.height
+
     def to_image(
         self,
         max_width: Optional[int] = None,
@@ -467,25 +637,21 @@ class Text2Image:
         image_width = max_width + padding_left + padding_right
         image_height = math.ceil(self.height + padding_top + padding_bottom)
 
-        surface = skia.Surfaces.MakeRasterN32Premul(image_width, image_height)
-        canvas = surface.getCanvas()
-        canvas.clear(to_skia_color(bg_color) if bg_color else skia.Color4f.kTransparent)
+        with pooled_surface(image_width, image_height) as surface:
+            canvas = surface.getCanvas()
+            if bg_color:
+                canvas.clear(to_skia_color(bg_color))
 
-        x = padding_left
-        y = padding_top
-        for para in self.paragraphs:
-            if para.stroke_paragraph:
-                para.stroke_paragraph.paint(canvas, x, y)
-            para.paragraph.paint(canvas, x, y)
-            y += para.height
+            self._paint(canvas, padding_left, padding_top)
 
-        surface.flushAndSubmit()
-        skia_image = surface.makeImageSnapshot()
-        pil_image = Image.fromarray(
-            skia_image.convert(
-                colorType=skia.kRGBA_8888_ColorType, alphaType=skia.kUnpremul_AlphaType
+            surface.flushAndSubmit()
+            pil_image = Image.fromarray(
+                surface.toarray(
+                    colorType=skia.kRGBA_8888_ColorType,
+                    alphaType=skia.kUnpremul_AlphaType,
+                ),
+                "RGBA",
             )
-        )
 
         return pil_image
 
@@ -493,35 +659,36 @@ class Text2Image:
         self, img: IMG, pos: PosTypeFloat, max_width: Optional[int] = None
     ):
         mode = img.mode
+        src = img if mode == "RGBA" else img.convert("RGBA")
+        # copy=False 时 skia 不持有数据的引用，需保证其在绘制完成前存活
+        data = src.tobytes()
         image = skia.Image.frombytes(
-            img.convert("RGBA").tobytes(),
+            data,
             img.size,  # type: ignore
             skia.kRGBA_8888_ColorType,
+            copy=False,
         )
-        surface = skia.Surfaces.MakeRasterN32Premul(image.width(), image.height())
-        canvas = surface.getCanvas()
-        canvas.drawImage(image, 0, 0)
-
         if not max_width:
             max_width = math.ceil(self.longest_line)
         self.wrap(max_width)
 
-        x = pos[0]
-        y = pos[1]
-        for para in self.paragraphs:
-            if para.stroke_paragraph:
-                para.stroke_paragraph.paint(canvas, x, y)
-            para.paragraph.paint(canvas, x, y)
-            y += para.height
+        # 目标图片尺寸各异且可能很大，不放入缓存池
+        surface = make_surface(image.width(), image.height())
+        canvas = surface.getCanvas()
+        canvas.drawImage(image, 0, 0)
+
+        self._paint(canvas, pos[0], pos[1])
 
         surface.flushAndSubmit()
-        skia_image = surface.makeImageSnapshot()
         pil_image = Image.fromarray(
-            skia_image.convert(
+            surface.toarray(
                 colorType=skia.kRGBA_8888_ColorType, alphaType=skia.kUnpremul_AlphaType
-            )
-        ).convert(mode)
-        img.im = pil_image.im.copy()  # type: ignore
+            ),
+            "RGBA",
+        )
+        if mode != "RGBA":
+            pil_image = pil_image.convert(mode)
+        img.im = pil_image.im  # type: ignore
 
 
 def text2image(
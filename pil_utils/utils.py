@@ -1,32 +1,53 @@
-from PIL.ImageColor import getrgb
+import re
+from functools import lru_cache
+
+from PIL.ImageColor import colormap, getrgb
 
 import skia
 from skia import textlayout
 
 from .typing import ColorType, FontStyle, HAlignType
 
+SKIA_TEXT_ALIGNS = {
+    "left": textlayout.TextAlign.kLeft,
+    "right": textlayout.TextAlign.kRight,
+    "center": textlayout.TextAlign.kCenter,
+}
+
+_INV255 = 1.0 / 255.0
+HEX_COLOR_PATTERN = re.compile(r"#[a-fA-F0-9]{6}")
+
+SKIA_FONT_STYLES = {
+    "normal": skia.FontStyle.Normal(),
+    "bold": skia.FontStyle.Bold(),
+    "italic": skia.FontStyle.Italic(),
+    "bold_italic": skia.FontStyle.BoldItalic(),
+}
+
 
 def to_skia_text_align(align: HAlignType) -> textlayout.TextAlign:  # type: ignore
-    if align == "center":
-        return textlayout.TextAlign.kCenter
-    elif align == "right":
-        return textlayout.TextAlign.kRight
-    return textlayout.TextAlign.kLeft
+    return SKIA_TEXT_ALIGNS.get(align, textlayout.TextAlign.kLeft)
 
 
 def to_skia_color(color: ColorType) -> skia.Color4f:
+    if not isinstance(color, str):
+        color = tuple(color)  # type: ignore
+    # 缓存中只保存不可变的分量，每次返回新的 `Color4f`，避免调用方修改共享对象
+    return skia.Color4f(*_to_rgba(color))
+
+
+@lru_cache(maxsize=256)
+def _to_rgba(color: ColorType) -> tuple[float, float, float, float]:
     if isinstance(color, str):
-        color = getrgb(color)
-    if len(color) == 3:
-        color = (color[0], color[1], color[2], 255)
-    return skia.Color4f(color[0] / 255, color[1] / 255, color[2] / 255, color[3] / 255)
+        hex_color = color if color.startswith("#") else colormap.get(color.lower())
+        if isinstance(hex_color, str) and HEX_COLOR_PATTERN.fullmatch(hex_color):
+            value = int(hex_color[1:], 16)
+            color = ((value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+        else:
+            color = getrgb(color)
+    a = color[3] if len(color) == 4 else 255
+    return (color[0] * _INV255, color[1] * _INV255, color[2] * _INV255, a * _INV255)
 
 
 def to_skia_font_style(font_style: FontStyle) -> skia.FontStyle:
-    if font_style == "bold":
-        return skia.FontStyle.Bold()
-    elif font_style == "italic":
-        return skia.FontStyle.Italic()
-    elif font_style == "bold_italic":
-        return skia.FontStyle.BoldItalic()
-    return skia.FontStyle.Normal()
+    return SKIA_FONT_STYLES.get(font_style, SKIA_FONT_STYLES["normal"])